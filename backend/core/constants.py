@@ -1,7 +1,7 @@
 """Game constants and configuration."""
 
-from enum import Enum
-from typing import Dict, List
+from enum import Enum, IntEnum
+from typing import Dict, List, Tuple
 
 # ======================
 # Game Modes
@@ -38,6 +38,33 @@ ROLE_FACTORY = "Factory"
 
 BEER_GAME_ROLES = [ROLE_SHOP, ROLE_RETAILER, ROLE_WHOLESALER, ROLE_FACTORY]
 
+
+class Role(IntEnum):
+    """Beer Game roles as integer codes, in BEER_GAME_ROLES order."""
+    SHOP = 0
+    RETAILER = 1
+    WHOLESALER = 2
+    FACTORY = 3
+
+
+# Role name -> Role code, for converting at API boundaries
+ROLE_BY_NAME: Dict[str, Role] = {
+    ROLE_SHOP: Role.SHOP,
+    ROLE_RETAILER: Role.RETAILER,
+    ROLE_WHOLESALER: Role.WHOLESALER,
+    ROLE_FACTORY: Role.FACTORY,
+}
+
+# Weeks of order / inventory history kept on each supply chain node
+NODE_HISTORY_WEEKS = 52
+
+# Weeks between placing an order and receiving it
+ORDER_DELAY_WEEKS = BEER_GAME_CONFIG["order_delay_weeks"]
+
+# Weekly cost per unit held in inventory / per unit on backorder
+HOLDING_COST_PER_UNIT = float(BEER_GAME_CONFIG["holding_cost_per_unit"])
+STOCKOUT_COST_PER_UNIT = float(BEER_GAME_CONFIG["stockout_cost_per_unit"])
+
 # Demand patterns
 DEMAND_PATTERNS = {
     "sine_wave": "Sine wave pattern",
@@ -128,6 +155,23 @@ FACTORY_MACHINES: Dict[str, Dict] = {
     },
 }
 
+# Flat machine type -> power consumption lookup
+MACHINE_POWER_CONSUMPTION: Dict[str, float] = {
+    machine_type: spec["power_consumption"]
+    for machine_type, spec in FACTORY_MACHINES.items()
+}
+
+# MachineType value -> ordinal code
+MACHINE_TYPE_CODES: Dict[str, int] = {
+    machine_type.value: code for code, machine_type in enumerate(MachineType)
+}
+
+# Power consumption indexed by machine type code; the trailing 0.0 is
+# what unknown types (code -1) resolve to
+MACHINE_POWER: Tuple[float, ...] = tuple(
+    MACHINE_POWER_CONSUMPTION.get(machine_type.value, 0.0) for machine_type in MachineType
+) + (0.0,)
+
 FACTORY_RECIPES = {
     "iron_plate": {
         "name": "Iron Plate",
@@ -1,34 +1,130 @@
 """Main game engine for Supply Chain Optimizer."""
 
+import functools
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+from bson.errors import InvalidDocument
+from pymongo import UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError
+
 from backend.core.constants import (
-    BEER_GAME_CONFIG, BEER_GAME_ROLES, BEER_GAME_SCORING,
-    GameMode, ORDER_DELAY_WEEKS
+    BEER_GAME_CONFIG, BEER_GAME_SCORING,
+    GameMode, HOLDING_COST_PER_UNIT, MONGO_COLLECTIONS, NODE_HISTORY_WEEKS, ORDER_DELAY_WEEKS,
+    ROLE_BY_NAME, STOCKOUT_COST_PER_UNIT, Role
 )
 from backend.core.utils import (
     generate_id, generate_game_id, generate_player_id,
-    calculate_demand, calculate_inventory_cost, calculate_backorder_cost,
-    get_timestamp
+    calculate_demand, precompute_demand, get_timestamp
 )
 from backend.models import (
-    SupplyChain, SupplyChainNode, Order, OrderStatus
+    SupplyChain, SupplyChainNode, OrderStatus, OrderStore
 )
+from backend.simulation import advance_week_kernel
 
 logger = logging.getLogger(__name__)
 
+# MongoDB error code for a duplicate _id / unique index violation
+_DUPLICATE_KEY_ERROR = 11000
+
+
+@dataclass
+class _VectorState:
+    """Struct-of-arrays state for every node of a game.
+    
+    Arrays are indexed ``[chain, Role]``; the pipeline adds a trailing
+    ``delivery_week % ORDER_DELAY_WEEKS`` axis holding in-transit units,
+    and the histories a leading week axis (row ``week - 1`` holds ``week``).
+    """
+    
+    inventory: np.ndarray
+    backorder: np.ndarray
+    incoming_order: np.ndarray
+    current_order: np.ndarray
+    total_cost: np.ndarray
+    pipeline: np.ndarray
+    joined_week: np.ndarray
+    active: np.ndarray  # whether a player holds the role
+    orders_history: np.ndarray
+    inventory_history: np.ndarray
+    step: Callable[[int], None] = field(init=False, repr=False)  # advance to a week
+    
+    def __post_init__(self) -> None:
+        """Bind the week kernel to this game's arrays and constants."""
+        self.step = functools.partial(
+            advance_week_kernel,
+            self.inventory, self.backorder, self.incoming_order,
+            self.pipeline, self.total_cost,
+            delay=ORDER_DELAY_WEEKS,
+            hold=HOLDING_COST_PER_UNIT,
+            stock=STOCKOUT_COST_PER_UNIT,
+        )
+    
+    @classmethod
+    def empty(cls, num_chains: int, weeks: int) -> "_VectorState":
+        """Create zeroed state for ``num_chains`` chains over ``weeks`` weeks."""
+        shape = (num_chains, len(Role))
+        return cls(
+            inventory=np.zeros(shape, dtype=np.int64),
+            backorder=np.zeros(shape, dtype=np.int64),
+            incoming_order=np.zeros(shape, dtype=np.int64),
+            current_order=np.zeros(shape, dtype=np.int64),
+            total_cost=np.zeros(shape, dtype=np.float64),
+            pipeline=np.zeros(shape + (ORDER_DELAY_WEEKS,), dtype=np.int64),
+            joined_week=np.zeros(shape, dtype=np.int64),
+            active=np.zeros(shape, dtype=np.bool_),
+            orders_history=np.empty((weeks,) + shape, dtype=np.int64),
+            inventory_history=np.empty((weeks,) + shape, dtype=np.int64),
+        )
+    
+    def reset_node(self, chain: int, role: int, inventory: int, week: int) -> None:
+        """Reset a node's slot when a player (re)joins."""
+        self.inventory[chain, role] = inventory
+        self.backorder[chain, role] = 0
+        self.incoming_order[chain, role] = 0
+        self.current_order[chain, role] = 0
+        self.total_cost[chain, role] = 0.0
+        self.joined_week[chain, role] = week
+        self.active[chain, role] = True
+    
+    def record_week(self, week: int) -> None:
+        """Store this week's orders and inventory in the histories."""
+        if week > len(self.orders_history):
+            # Played past the planned weeks; double the history length
+            extra = (max(week, len(self.orders_history)),) + self.inventory.shape
+            self.orders_history = np.concatenate(
+                (self.orders_history, np.empty(extra, dtype=np.int64)))
+            self.inventory_history = np.concatenate(
+                (self.inventory_history, np.empty(extra, dtype=np.int64)))
+        self.orders_history[week - 1] = self.current_order
+        self.inventory_history[week - 1] = self.inventory
+
 
 class BeerGameEngine:
     """Game engine for Beer Game mode."""
     
-    def __init__(self):
-        """Initialize the Beer Game engine."""
+    def __init__(self, db: Optional[Database] = None):
+        """Initialize the Beer Game engine.
+        
+        Args:
+            db: MongoDB database to persist to; nothing is persisted if None
+        """
+        self.db = db
         self.games: Dict[str, Dict] = {}  # game_id -> game state
         self.supply_chains: Dict[str, SupplyChain] = {}  # chain_id -> supply chain
-        self.orders: Dict[str, List[Order]] = {}  # chain_id -> orders list
+        self.orders: Dict[str, OrderStore] = {}  # chain_id -> orders
         self.order_queue: Dict[str, List[int]] = {}  # chain_id -> upcoming orders
+        self.vector_states: Dict[str, _VectorState] = {}  # game_id -> node state arrays
+        self.chain_index: Dict[str, int] = {}  # chain_id -> row in the state arrays
+        # collection -> documents / $set updates awaiting the next flush
+        self._pending_writes: Dict[str, List[Dict]] = defaultdict(list)
+        self._pending_updates: Dict[str, List[UpdateOne]] = defaultdict(list)
         
     def create_game(self, num_chains: int = 1, weeks: int = 52,
                    demand_pattern: str = "sine_wave") -> str:
@@ -53,7 +149,10 @@ class BeerGameEngine:
             "started_at": get_timestamp(),
             "status": "waiting",  # waiting, playing, finished
             "supply_chains": [],
+            # Patterns such as sine_wave dip below zero; customers never return stock
+            "demand_trace": np.maximum(precompute_demand(demand_pattern, weeks), 0),
         }
+        self.vector_states[game_id] = _VectorState.empty(num_chains, weeks)
         
         # Create supply chains
         for i in range(num_chains):
@@ -61,10 +160,22 @@ class BeerGameEngine:
             supply_chain = SupplyChain(chain_id=chain_id, game_id=game_id)
             self.supply_chains[chain_id] = supply_chain
             self.games[game_id]["supply_chains"].append(chain_id)
-            self.orders[chain_id] = []
+            self.orders[chain_id] = OrderStore(chain_id, game_id)
             self.order_queue[chain_id] = []
+            self.chain_index[chain_id] = i
+            self._queue_write("supply_chains", supply_chain.to_dict())
+        
+        game = self.games[game_id]
+        self._queue_write("games", {
+            key: game[key] for key in (
+                "game_id", "num_chains", "weeks", "demand_pattern",
+                "current_week", "started_at", "status", "supply_chains",
+            )
+        })
+        
+        self.flush_pending()
         
-        logger.info(f"Created game {game_id} with {num_chains} supply chains")
+        logger.info("Created game %s with %d supply chains", game_id, num_chains)
         return game_id
     
     def join_game(self, game_id: str, supply_chain_id: str, role: str,
@@ -81,16 +192,17 @@ class BeerGameEngine:
             Player ID if successful
         """
         if game_id not in self.games:
-            logger.error(f"Game {game_id} not found")
+            logger.error("Game %s not found", game_id)
             return None
         
-        if role not in BEER_GAME_ROLES:
-            logger.error(f"Invalid role: {role}")
+        role_code = ROLE_BY_NAME.get(role)
+        if role_code is None:
+            logger.error("Invalid role: %s", role)
             return None
         
         chain_id = f"{game_id}_{supply_chain_id}"
         if chain_id not in self.supply_chains:
-            logger.error(f"Supply chain {chain_id} not found")
+            logger.error("Supply chain %s not found", chain_id)
             return None
         
         player_id = generate_player_id()
@@ -105,31 +217,55 @@ class BeerGameEngine:
         )
         
         supply_chain.set_node(role, node)
-        logger.info(f"Player {player_name} ({player_id}) joined as {role}")
+        self.vector_states[game_id].reset_node(
+            self.chain_index[chain_id], role_code,
+            node.inventory, self.games[game_id]["current_week"],
+        )
+        self._queue_write("players", {
+            "player_id": player_id,
+            "player_name": player_name,
+            "game_id": game_id,
+            "supply_chain_id": chain_id,
+            "role": role,
+            "joined_at": get_timestamp(),
+        })
+        self.flush_pending()
+        logger.info("Player %s (%s) joined as %s", player_name, player_id, role)
         
         return player_id
     
     def place_customer_order(self, game_id: str, chain_id: str, week: int,
-                            quantity: int) -> bool:
+                            quantity: Optional[int] = None) -> bool:
         """Place a customer order for the supply chain.
         
         Args:
             game_id: Game ID
             chain_id: Supply chain ID
             week: Week number
-            quantity: Order quantity
+            quantity: Order quantity (defaults to the game's demand for the week)
             
         Returns:
             True if order was placed
         """
         full_chain_id = f"{game_id}_{chain_id}"
         if full_chain_id not in self.supply_chains:
-            logger.error(f"Supply chain {full_chain_id} not found")
+            logger.error("Supply chain %s not found", full_chain_id)
             return False
         
-        supply_chain = self.supply_chains[full_chain_id]
-        if supply_chain.shop:
-            supply_chain.shop.incoming_order = quantity
+        if quantity is None:
+            demand_trace = self.games[game_id]["demand_trace"]
+            if not 0 <= week < len(demand_trace):
+                logger.error("Week %d outside of game %s", week, game_id)
+                return False
+            quantity = int(demand_trace[week])
+        elif quantity < 0:
+            logger.error("Invalid customer order quantity: %d", quantity)
+            return False
+        
+        state = self.vector_states[game_id]
+        chain = self.chain_index[full_chain_id]
+        if state.active[chain, Role.SHOP]:
+            state.incoming_order[chain, Role.SHOP] = quantity
             return True
         
         return False
@@ -149,37 +285,34 @@ class BeerGameEngine:
             Order ID if successful
         """
         full_chain_id = f"{game_id}_{chain_id}"
-        supply_chain = self.supply_chains.get(full_chain_id)
-        
-        if not supply_chain:
+        if full_chain_id not in self.supply_chains:
             return None
         
-        from_node = supply_chain.get_node(from_role)
-        to_node = supply_chain.get_node(to_role)
+        from_code = ROLE_BY_NAME.get(from_role)
+        to_code = ROLE_BY_NAME.get(to_role)
+        state = self.vector_states[game_id]
+        chain = self.chain_index[full_chain_id]
         
-        if not from_node or not to_node:
+        if (from_code is None or to_code is None
+                or not state.active[chain, from_code] or not state.active[chain, to_code]):
             return None
         
         # Create order
         order_id = generate_id("order")
-        current_week = supply_chain.current_week
+        current_week = self.games[game_id]["current_week"]
         delivery_week = current_week + ORDER_DELAY_WEEKS
         
-        order = Order(
-            order_id=order_id,
-            from_role=from_role,
-            to_role=to_role,
-            supply_chain_id=full_chain_id,
-            game_id=game_id,
-            quantity=quantity,
-            created_week=current_week,
-            delivery_week=delivery_week,
-        )
+        orders = self.orders[full_chain_id]
+        orders.append(order_id, from_code, to_code, quantity,
+                      current_week, delivery_week, time.time_ns())
+        if self.db is not None:
+            self._queue_write("orders", orders.get(order_id).to_dict())
         
-        self.orders[full_chain_id].append(order)
-        from_node.current_order = quantity
+        state.current_order[chain, from_code] = quantity
+        state.pipeline[chain, to_code, delivery_week % ORDER_DELAY_WEEKS] += quantity
         
-        logger.info(f"Order created: {order_id} from {from_role} to {to_role} ({quantity} units)")
+        logger.info("Order created: %s from %s to %s (%d units)",
+                    order_id, from_role, to_role, quantity)
         return order_id
     
     def advance_week(self, game_id: str) -> bool:
@@ -192,102 +325,148 @@ class BeerGameEngine:
             True if week was advanced
         """
         if game_id not in self.games:
-            logger.error(f"Game {game_id} not found")
+            logger.error("Game %s not found", game_id)
             return False
         
         game = self.games[game_id]
         game["current_week"] += 1
+        current_week = game["current_week"]
         
-        # Process all supply chains
-        for chain_id in game["supply_chains"]:
-            self._process_supply_chain_week(game_id, chain_id, game["current_week"])
+        state = self.vector_states[game_id]
+        state.step(current_week)
+        
+        state.record_week(current_week)
         
-        logger.info(f"Game {game_id} advanced to week {game['current_week']}")
+        for chain_id in game["supply_chains"]:
+            for order_id in self.orders[chain_id].deliver(current_week):
+                self._queue_update("orders", {"order_id": order_id}, {
+                    "status": OrderStatus.DELIVERED,
+                    "actual_delivery_week": current_week,
+                })
+        self._queue_update("games", {"game_id": game_id}, {"current_week": current_week})
+        self.flush_pending()
+        
+        logger.debug("Game %s advanced to week %d", game_id, current_week)
         return True
     
-    def _process_supply_chain_week(self, game_id: str, chain_index: int,
-                                  current_week: int) -> None:
-        """Process a supply chain for one week.
-        
-        Args:
-            game_id: Game ID
-            chain_index: Supply chain index
-            current_week: Current week number
-        """
-        chain_id = f"{game_id}_chain_{chain_index}"
-        supply_chain = self.supply_chains.get(chain_id)
+    def _queue_write(self, collection: str, document: Dict) -> None:
+        """Queue a document for the next bulk insert."""
+        if self.db is not None:
+            self._pending_writes[MONGO_COLLECTIONS[collection]].append(document)
+    
+    def _queue_update(self, collection: str, selector: Dict, values: Dict) -> None:
+        """Queue a ``$set`` update for the next bulk write."""
+        if self.db is not None:
+            self._pending_updates[MONGO_COLLECTIONS[collection]].append(
+                UpdateOne(selector, {"$set": values})
+            )
+    
+    def flush_pending(self) -> bool:
+        """Persist queued inserts and updates, one bulk call per collection.
         
-        if not supply_chain:
-            return
+        Inserts are flushed before updates so updates can target documents
+        created in the same batch. Operations that fail on a connection
+        error stay queued for the next flush, and a collection's updates
+        wait until its own queued inserts have been written. Operations the
+        server rejects are logged and dropped, since retrying cannot help.
         
-        supply_chain.current_week = current_week
+        Returns:
+            True if all queued operations were written
+        """
+        if self.db is None:
+            return True
         
-        # Process each node
-        for node in supply_chain.get_nodes():
-            if node:
-                self._process_node_week(supply_chain, node, current_week)
+        writes, self._pending_writes = self._pending_writes, defaultdict(list)
+        updates, self._pending_updates = self._pending_updates, defaultdict(list)
+        success = True
+        
+        for collection, documents in writes.items():
+            retry, written = self._insert_documents(collection, documents)
+            if retry:
+                self._pending_writes[collection].extend(retry)
+            success = success and written
+        
+        for collection, operations in updates.items():
+            if collection in self._pending_writes:
+                # Updates may target documents still waiting to be inserted
+                self._pending_updates[collection].extend(operations)
+                success = False
+                continue
+            try:
+                self.db[collection].bulk_write(operations, ordered=False)
+            except ConnectionFailure as e:
+                # $set updates are idempotent, so the whole batch is retried
+                logger.error("Failed to update %s, will retry: %s", collection, e)
+                self._pending_updates[collection].extend(operations)
+                success = False
+            except PyMongoError as e:
+                logger.error("Dropped updates to %s: %s", collection, e)
+                success = False
+        
+        return success
     
-    def _process_node_week(self, supply_chain: SupplyChain,
-                          node: SupplyChainNode, current_week: int) -> None:
-        """Process a node for one week.
+    def _insert_documents(self, collection: str,
+                          documents: List[Dict]) -> Tuple[List[Dict], bool]:
+        """Insert documents into a collection.
+        
+        ``insert_many`` assigns each document its ``_id`` before sending, so
+        a retried document that already reached the server fails with a
+        duplicate key error and is counted as stored.
         
         Args:
-            supply_chain: Supply chain instance
-            node: Node to process
-            current_week: Current week number
+            collection: Collection name
+            documents: Documents to insert
+            
+        Returns:
+            Documents to retry after a connection failure, and whether
+            every document was stored
         """
-        # 1. Receive incoming items from orders placed 4 weeks ago
-        incoming = self._get_incoming_orders(supply_chain.chain_id, node.role, current_week)
-        node.inventory += sum(order.quantity for order in incoming)
-        
-        # 2. Fulfill outgoing demand
-        # Get demand from downstream (or incoming order for shop)
-        demand = node.incoming_order
-        
-        # Fulfill as much as possible
-        fulfilled = min(node.inventory, demand)
-        node.inventory -= fulfilled
-        
-        # Track backorder
-        if fulfilled < demand:
-            node.backorder += demand - fulfilled
-        else:
-            node.backorder = 0
-        
-        # 3. Calculate costs
-        holding_cost = calculate_inventory_cost(
-            node.inventory,
-            BEER_GAME_CONFIG["holding_cost_per_unit"]
-        )
-        stockout_cost = calculate_backorder_cost(
-            node.backorder,
-            BEER_GAME_CONFIG["stockout_cost_per_unit"]
-        )
-        node.total_cost += holding_cost + stockout_cost
-        
-        # 4. Track history
-        node.orders_history.append(node.current_order)
-        node.inventory_history.append(node.inventory)
+        try:
+            self.db[collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            rejected = [
+                error for error in e.details.get("writeErrors", [])
+                if error.get("code") != _DUPLICATE_KEY_ERROR
+            ]
+            for error in rejected:
+                logger.error("Dropped document rejected by %s: %s",
+                             collection, error.get("errmsg"))
+            return [], not rejected
+        except ConnectionFailure as e:
+            logger.error("Failed to insert into %s, will retry: %s", collection, e)
+            return documents, False
+        except (PyMongoError, InvalidDocument) as e:
+            logger.error("Dropped %d documents for %s: %s", len(documents), collection, e)
+            return [], False
+        return [], True
     
-    def _get_incoming_orders(self, chain_id: str, role: str,
-                            current_week: int) -> List[Order]:
-        """Get orders that arrive this week.
+    def _sync_nodes(self, game_id: str) -> None:
+        """Copy the vectorized state onto the game's SupplyChainNode views.
         
         Args:
-            chain_id: Supply chain ID
-            role: Role receiving orders
-            current_week: Current week
-            
-        Returns:
-            List of incoming orders
+            game_id: Game ID
         """
-        incoming = []
-        for order in self.orders.get(chain_id, []):
-            if order.to_role == role and order.delivery_week == current_week:
-                order.status = OrderStatus.DELIVERED
-                order.actual_delivery_week = current_week
-                incoming.append(order)
-        return incoming
+        game = self.games[game_id]
+        state = self.vector_states[game_id]
+        week = game["current_week"]
+        
+        for chain_id in game["supply_chains"]:
+            supply_chain = self.supply_chains[chain_id]
+            supply_chain.current_week = week
+            chain = self.chain_index[chain_id]
+            
+            for node in supply_chain.get_nodes():
+                role = ROLE_BY_NAME[node.role]
+                start = max(int(state.joined_week[chain, role]), week - NODE_HISTORY_WEEKS)
+                node.inventory = int(state.inventory[chain, role])
+                node.backorder = int(state.backorder[chain, role])
+                node.current_order = int(state.current_order[chain, role])
+                node.incoming_order = int(state.incoming_order[chain, role])
+                node.total_cost = float(state.total_cost[chain, role])
+                node.load_history(
+                    state.orders_history[start:week, chain, role],
+                    state.inventory_history[start:week, chain, role],
+                )
     
     def get_game_state(self, game_id: str) -> Optional[Dict]:
         """Get current game state.
@@ -303,6 +482,7 @@ class BeerGameEngine:
         
         game = self.games[game_id]
         chains = []
+        self._sync_nodes(game_id)
         
         for chain_id in game["supply_chains"]:
             supply_chain = self.supply_chains[chain_id]
@@ -316,7 +496,3 @@ class BeerGameEngine:
             "demand_pattern": game["demand_pattern"],
             "supply_chains": chains,
         }
-
-
-# Constants that should be in core/constants.py
-ORDER_DELAY_WEEKS = 4
@@ -1,6 +1,9 @@
 """Logging configuration."""
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
@@ -8,6 +11,9 @@ from pathlib import Path
 def setup_logging(level: str = "INFO", log_dir: str = "logs") -> None:
     """Setup logging configuration.
     
+    Records are handed to a background thread through a queue, so callers
+    never block on console or file I/O.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_dir: Directory to store log files
@@ -29,7 +35,9 @@ def setup_logging(level: str = "INFO", log_dir: str = "logs") -> None:
     console_handler.setFormatter(console_formatter)
     
     # File handler
-    file_handler = logging.FileHandler(log_path / "app.log")
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_path / "app.log", maxBytes=10_000_000, backupCount=5
+    )
     file_handler.setLevel(getattr(logging, level.upper()))
     file_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -37,9 +45,15 @@ def setup_logging(level: str = "INFO", log_dir: str = "logs") -> None:
     )
     file_handler.setFormatter(file_formatter)
     
-    # Add handlers
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    # Add handlers behind a queue drained by a listener thread
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
 
 def get_logger(name: str) -> logging.Logger:
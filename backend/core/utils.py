@@ -1,33 +1,66 @@
 """Utility functions for the game."""
 
-import json
+import itertools
 import logging
+import re
+import secrets
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from uuid import uuid4
+
+import numpy as np
+import orjson
 
 logger = logging.getLogger(__name__)
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
+# ID sequence; the random start keeps IDs from separate processes apart
+_ID_COUNTER = itertools.count(secrets.randbits(32))
+
+# Last (time_ns, ISO string) handed out by get_timestamp, reused within the same
+# millisecond; replaced as one tuple so threads never pair a new time with an old string
+_TIMESTAMP_CACHE = (0, "")
+
 
 def generate_id(prefix: str = "") -> str:
-    """Generate a unique ID."""
-    unique_id = str(uuid4())[:8]
+    """Generate a unique ID.
+    
+    IDs are sequential, so they must not be used where guessing one
+    grants access (games and players use random IDs).
+    """
+    unique_id = f"{next(_ID_COUNTER) & 0xFFFFFFFF:08x}"
     return f"{prefix}_{unique_id}" if prefix else unique_id
 
 
 def generate_game_id() -> str:
-    """Generate a unique game ID."""
-    return generate_id("game")
+    """Generate a unique, unguessable game ID."""
+    return f"game_{secrets.token_hex(4)}"
 
 
 def generate_player_id() -> str:
-    """Generate a unique player ID."""
-    return generate_id("player")
+    """Generate a unique, unguessable player ID."""
+    return f"player_{secrets.token_hex(4)}"
 
 
 def get_timestamp() -> str:
-    """Get current timestamp in ISO format."""
-    return datetime.utcnow().isoformat()
+    """Get current timestamp in ISO format.
+    
+    Calls within the same millisecond share one formatted timestamp.
+    """
+    global _TIMESTAMP_CACHE
+    now = time.time_ns()
+    cached_ns, cached = _TIMESTAMP_CACHE
+    if 0 <= now - cached_ns < 1_000_000:
+        return cached
+    timestamp = format_timestamp_ns(now)
+    _TIMESTAMP_CACHE = (now, timestamp)
+    return timestamp
+
+
+def format_timestamp_ns(timestamp_ns: int) -> str:
+    """Format a ``time.time_ns()`` value as a UTC ISO timestamp."""
+    return datetime.utcfromtimestamp(timestamp_ns / 1e9).isoformat()
 
 
 def calculate_demand(pattern: str, week: int, amplitude: int = 10, offset: int = 5) -> int:
@@ -57,6 +90,37 @@ def calculate_demand(pattern: str, week: int, amplitude: int = 10, offset: int =
         return offset
 
 
+def precompute_demand(pattern: str, weeks: int, amplitude: int = 10, offset: int = 5,
+                      seed: Optional[int] = None) -> np.ndarray:
+    """Precompute the demand for every week of a game.
+    
+    Produces the same values as ``calculate_demand`` for weeks
+    ``0 .. weeks - 1`` so lookups during play are plain array indexing.
+    
+    Args:
+        pattern: Demand pattern type (sine_wave, step, random, constant)
+        weeks: Number of weeks to generate
+        amplitude: Amplitude of demand variation
+        offset: Base demand offset
+        seed: Seed for the random pattern
+        
+    Returns:
+        Integer array of demand indexed by week
+    """
+    week = np.arange(weeks)
+    
+    if pattern == "sine_wave":
+        return (amplitude * np.sin(week * 0.1) + offset).astype(np.int64)
+    elif pattern == "step":
+        return np.where((week // 10) % 2 == 0, amplitude, offset).astype(np.int64)
+    elif pattern == "random":
+        rng = np.random.default_rng(seed)
+        return rng.integers(offset - amplitude // 2, offset + amplitude // 2,
+                            size=weeks, endpoint=True, dtype=np.int64)
+    else:
+        return np.full(weeks, offset, dtype=np.int64)
+
+
 def calculate_inventory_cost(quantity: int, cost_per_unit: float) -> float:
     """Calculate inventory holding cost.
     
@@ -83,9 +147,19 @@ def calculate_backorder_cost(quantity: int, cost_per_unit: float) -> float:
     return max(0, -quantity) * cost_per_unit
 
 
+def _json_default(obj: Any) -> Any:
+    """Fallback encoder for types orjson does not serialize natively."""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return str(obj)
+
+
 def safe_json_encode(obj: Any) -> str:
     """Safely encode object to JSON.
     
+    Models are encoded through their ``to_dict``; NumPy arrays and
+    scalars are encoded natively.
+    
     Args:
         obj: Object to encode
         
@@ -93,7 +167,12 @@ def safe_json_encode(obj: Any) -> str:
         JSON string
     """
     try:
-        return json.dumps(obj, default=str)
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=(orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+                    | orjson.OPT_SERIALIZE_NUMPY),
+        ).decode()
     except Exception as e:
         logger.error(f"JSON encoding error: {e}")
         return "{}"
@@ -109,7 +188,7 @@ def safe_json_decode(json_str: str) -> Dict[str, Any]:
         Decoded dictionary
     """
     try:
-        return json.loads(json_str)
+        return orjson.loads(json_str)
     except Exception as e:
         logger.error(f"JSON decoding error: {e}")
         return {}
@@ -118,6 +197,9 @@ def safe_json_decode(json_str: str) -> Dict[str, Any]:
 def deep_merge(base: Dict, updates: Dict) -> Dict:
     """Recursively merge dictionaries.
     
+    Only the nested dicts along paths touched by ``updates`` are copied;
+    untouched subtrees are shared with ``base``.
+    
     Args:
         base: Base dictionary
         updates: Updates to merge
@@ -126,11 +208,16 @@ def deep_merge(base: Dict, updates: Dict) -> Dict:
         Merged dictionary
     """
     result = base.copy()
-    for key, value in updates.items():
-        if isinstance(value, dict) and key in result and isinstance(result[key], dict):
-            result[key] = deep_merge(result[key], value)
-        else:
-            result[key] = value
+    stack = [(result, updates)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            current = target.get(key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                target[key] = current.copy()
+                stack.append((target[key], value))
+            else:
+                target[key] = value
     return result
 
 
@@ -143,9 +230,7 @@ def validate_email(email: str) -> bool:
     Returns:
         True if valid email format
     """
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return _EMAIL_RE.match(email) is not None
 
 
 def clamp(value: float, min_val: float, max_val: float) -> float:
@@ -2,7 +2,7 @@
 
 from .supply_chain import SupplyChain, SupplyChainNode
 from .inventory import Inventory, InventoryItem
-from .orders import Order
+from .orders import Order, OrderStatus, OrderStore, orders_to_json
 from .factory import Factory, Machine
 
 __all__ = [
@@ -11,6 +11,9 @@ __all__ = [
     "Inventory",
     "InventoryItem",
     "Order",
+    "OrderStatus",
+    "OrderStore",
+    "orders_to_json",
     "Factory",
     "Machine",
 ]
@@ -2,10 +2,14 @@
 
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime
 
+import numpy as np
 
-@dataclass
+from ..core.constants import MACHINE_POWER, MACHINE_TYPE_CODES
+from ..core.utils import get_timestamp
+
+
+@dataclass(slots=True)
 class Machine:
     """Represents a machine in the factory."""
     
@@ -22,7 +26,12 @@ class Machine:
     output_items: Dict[str, int] = field(default_factory=dict)
     current_recipe: Optional[str] = None
     progress: float = 0.0  # 0.0 to 1.0
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    created_at: str = field(default_factory=get_timestamp)
+    type_code: int = field(init=False, repr=False, compare=False)  # index into MACHINE_POWER
+    
+    def __post_init__(self) -> None:
+        """Resolve the machine type code (-1 for unknown types)."""
+        self.type_code = MACHINE_TYPE_CODES.get(self.machine_type, -1)
     
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
@@ -44,7 +53,7 @@ class Machine:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Factory:
     """Represents a player's factory."""
     
@@ -60,7 +69,13 @@ class Factory:
     production_rate: float = 0.0
     efficiency: float = 1.0
     current_week: int = 0
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    created_at: str = field(default_factory=get_timestamp)
+    _power_cache: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _occupancy: np.ndarray = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        """Build the occupancy grid for any machines passed in."""
+        self._rebuild_occupancy()
     
     def add_machine(self, machine: Machine) -> bool:
         """Add a machine to the factory.
@@ -71,42 +86,75 @@ class Factory:
         # Check if position is valid
         if self._is_position_valid(machine.x, machine.y, machine.width, machine.height):
             self.machines[machine.machine_id] = machine
+            self._occupy(machine, 1)
+            self._power_cache = None
             return True
         return False
     
     def remove_machine(self, machine_id: str) -> bool:
         """Remove a machine from the factory."""
         if machine_id in self.machines:
-            del self.machines[machine_id]
+            self._occupy(self.machines.pop(machine_id), 0)
+            self._power_cache = None
+            return True
+        return False
+    
+    def set_machine_active(self, machine_id: str, is_active: bool) -> bool:
+        """Turn a machine on or off."""
+        if machine_id in self.machines:
+            self.machines[machine_id].is_active = is_active
+            self._power_cache = None
+            return True
+        return False
+    
+    def set_machine_power(self, machine_id: str, power_level: float) -> bool:
+        """Set a machine's power level (0.0 to 1.0)."""
+        if machine_id in self.machines:
+            self.machines[machine_id].power_level = power_level
+            self._power_cache = None
             return True
         return False
     
+    def mark_dirty(self) -> None:
+        """Resync cached state with ``machines``.
+        
+        Rebuilds the occupancy grid and invalidates cached power
+        consumption. Call after changing ``machines`` or a machine's
+        position, size, ``is_active`` or ``power_level`` directly instead
+        of through the factory.
+        """
+        self._rebuild_occupancy()
+        self._power_cache = None
+    
     def _is_position_valid(self, x: int, y: int, width: int, height: int) -> bool:
         """Check if position is valid (no overlap, within bounds)."""
         if x < 0 or y < 0 or x + width > self.width or y + height > self.height:
             return False
         
         # Check for overlap with existing machines
+        return not self._occupancy[y:y + height, x:x + width].any()
+    
+    def _rebuild_occupancy(self) -> None:
+        """Recompute the occupancy grid from ``machines``."""
+        self._occupancy = np.zeros((self.height, self.width), dtype=np.uint8)
         for machine in self.machines.values():
-            if self._check_overlap(x, y, width, height, machine.x, machine.y, machine.width, machine.height):
-                return False
-        
-        return True
+            self._occupy(machine, 1)
     
-    @staticmethod
-    def _check_overlap(x1: int, y1: int, w1: int, h1: int,
-                      x2: int, y2: int, w2: int, h2: int) -> bool:
-        """Check if two rectangles overlap."""
-        return not (x1 + w1 <= x2 or x2 + w2 <= x1 or y1 + h1 <= y2 or y2 + h2 <= y1)
+    def _occupy(self, machine: Machine, value: int) -> None:
+        """Mark (1) or clear (0) the grid cells covered by a machine."""
+        self._occupancy[machine.y:machine.y + machine.height,
+                        machine.x:machine.x + machine.width] = value
     
     def get_total_power_consumption(self) -> float:
         """Calculate total power consumption."""
-        from ..core.constants import FACTORY_MACHINES
+        if self._power_cache is not None:
+            return self._power_cache
+        
         total = 0.0
         for machine in self.machines.values():
-            if machine.is_active and machine.machine_type in FACTORY_MACHINES:
-                consumption = FACTORY_MACHINES[machine.machine_type]["power_consumption"]
-                total += consumption * machine.power_level
+            if machine.is_active:
+                total += MACHINE_POWER[machine.type_code] * machine.power_level
+        self._power_cache = total
         return total
     
     def to_dict(self) -> Dict:
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List
 
 
-@dataclass
+@dataclass(slots=True)
 class InventoryItem:
     """Represents an inventory item."""
     
@@ -25,7 +25,7 @@ class InventoryItem:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Inventory:
     """Represents a player's inventory."""
     
@@ -1,13 +1,19 @@
 """Order model for supply chain."""
 
+import sys
+import time
 from dataclasses import dataclass, field
-from typing import Dict, Optional
-from datetime import datetime
-from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional
 
+import numpy as np
+import orjson
 
-class OrderStatus(str, Enum):
-    """Order status enumeration."""
+from ..core.constants import BEER_GAME_ROLES, Role
+from ..core.utils import format_timestamp_ns
+
+
+class OrderStatus:
+    """Order status values (plain strings)."""
     PENDING = "pending"
     CONFIRMED = "confirmed"
     SHIPPED = "shipped"
@@ -15,7 +21,7 @@ class OrderStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """Represents an order in the supply chain."""
     
@@ -25,17 +31,21 @@ class Order:
     supply_chain_id: str
     game_id: str
     quantity: int
-    status: OrderStatus = OrderStatus.PENDING
+    status: str = OrderStatus.PENDING
     created_week: int = 0
     delivery_week: int = 0  # Week when order arrives
     actual_delivery_week: Optional[int] = None
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    created_at_ns: int = field(default_factory=time.time_ns)  # formatted on output
+    
+    def __post_init__(self) -> None:
+        """Intern role names so equal roles share one string object."""
+        self.from_role = sys.intern(self.from_role)
+        self.to_role = sys.intern(self.to_role)
     
     def is_delayed(self, current_week: int) -> bool:
         """Check if order is delayed."""
-        if self.status == OrderStatus.DELIVERED:
-            return (self.actual_delivery_week or 0) > self.delivery_week
-        return current_week > self.delivery_week and self.status != OrderStatus.DELIVERED
+        return ((self.actual_delivery_week or 0) if self.status == OrderStatus.DELIVERED
+                else current_week) > self.delivery_week
     
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
@@ -46,9 +56,159 @@ class Order:
             "supply_chain_id": self.supply_chain_id,
             "game_id": self.game_id,
             "quantity": self.quantity,
-            "status": self.status.value,
+            "status": self.status,
             "created_week": self.created_week,
             "delivery_week": self.delivery_week,
             "actual_delivery_week": self.actual_delivery_week,
-            "created_at": self.created_at,
+            "created_at": format_timestamp_ns(self.created_at_ns),
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes."""
+        return orjson.dumps(self.to_dict())
+
+
+def orders_to_json(orders: Iterable[Order]) -> bytes:
+    """Serialize orders to a JSON array.
+    
+    Args:
+        orders: Orders to serialize
+        
+    Returns:
+        UTF-8 JSON array of the orders' dictionary forms
+    """
+    return orjson.dumps([order.to_dict() for order in orders])
+
+
+# Status <-> small-integer codes used by OrderStore columns
+_STATUSES = (
+    OrderStatus.PENDING,
+    OrderStatus.CONFIRMED,
+    OrderStatus.SHIPPED,
+    OrderStatus.DELIVERED,
+    OrderStatus.CANCELLED,
+)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+
+class OrderStore:
+    """Column-oriented storage for the orders of one supply chain.
+    
+    Each order field lives in its own NumPy array (roles and statuses as
+    small integer codes), and rows are indexed by delivery week so weekly
+    delivery touches only the orders due that week. ``Order`` instances are built on
+    request and are snapshots: changing them does not update the store.
+    """
+    
+    def __init__(self, supply_chain_id: str, game_id: str, capacity: int = 64):
+        """Create an empty store.
+        
+        Args:
+            supply_chain_id: Supply chain the orders belong to
+            game_id: Game the orders belong to
+            capacity: Initial number of order slots
+        """
+        self.supply_chain_id = supply_chain_id
+        self.game_id = game_id
+        self.size = 0
+        self.order_ids: List[str] = []
+        self.created_at_ns = np.empty(capacity, dtype=np.int64)
+        self.from_role = np.empty(capacity, dtype=np.uint8)
+        self.to_role = np.empty(capacity, dtype=np.uint8)
+        self.quantity = np.empty(capacity, dtype=np.int64)
+        self.status = np.empty(capacity, dtype=np.uint8)
+        self.created_week = np.empty(capacity, dtype=np.int32)
+        self.delivery_week = np.empty(capacity, dtype=np.int32)
+        self.actual_delivery_week = np.empty(capacity, dtype=np.int32)  # -1 until delivered
+        self._index: Dict[str, int] = {}  # order_id -> row
+        self._due: Dict[int, List[int]] = {}  # delivery week -> undelivered rows
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self) -> Iterator[Order]:
+        for row in range(self.size):
+            yield self._build(row)
+    
+    def append(self, order_id: str, from_role: Role, to_role: Role, quantity: int,
+               created_week: int, delivery_week: int, created_at_ns: int) -> int:
+        """Add a pending order.
+        
+        Returns:
+            Row of the new order
+        """
+        if self.size == len(self.quantity):
+            self._grow()
+        
+        row = self.size
+        self.order_ids.append(order_id)
+        self.from_role[row] = from_role
+        self.to_role[row] = to_role
+        self.quantity[row] = quantity
+        self.status[row] = _STATUS_CODES[OrderStatus.PENDING]
+        self.created_week[row] = created_week
+        self.delivery_week[row] = delivery_week
+        self.actual_delivery_week[row] = -1
+        self.created_at_ns[row] = created_at_ns
+        self._index[order_id] = row
+        self._due.setdefault(delivery_week, []).append(row)
+        self.size += 1
+        return row
+    
+    def deliver(self, week: int) -> List[str]:
+        """Mark every order due this week as delivered.
+        
+        Returns:
+            IDs of the delivered orders
+        """
+        rows = np.array(self._due.pop(week, ()), dtype=np.intp)
+        self.status[rows] = _STATUS_CODES[OrderStatus.DELIVERED]
+        self.actual_delivery_week[rows] = week
+        return [self.order_ids[row] for row in rows]
+    
+    def delayed_mask(self, current_week: int) -> np.ndarray:
+        """Vectorized ``Order.is_delayed`` over every stored order.
+        
+        Args:
+            current_week: Current game week
+            
+        Returns:
+            Boolean array, one entry per order in insertion order
+        """
+        size = self.size
+        delivered = self.status[:size] == _STATUS_CODES[OrderStatus.DELIVERED]
+        effective_week = np.where(delivered, self.actual_delivery_week[:size], current_week)
+        return effective_week > self.delivery_week[:size]
+    
+    def get(self, order_id: str) -> Optional[Order]:
+        """Get an order by ID."""
+        row = self._index.get(order_id)
+        return self._build(row) if row is not None else None
+    
+    def _build(self, row: int) -> Order:
+        """Build an Order snapshot from one row."""
+        actual_delivery_week = int(self.actual_delivery_week[row])
+        return Order(
+            order_id=self.order_ids[row],
+            from_role=BEER_GAME_ROLES[self.from_role[row]],
+            to_role=BEER_GAME_ROLES[self.to_role[row]],
+            supply_chain_id=self.supply_chain_id,
+            game_id=self.game_id,
+            quantity=int(self.quantity[row]),
+            status=_STATUSES[self.status[row]],
+            created_week=int(self.created_week[row]),
+            delivery_week=int(self.delivery_week[row]),
+            actual_delivery_week=actual_delivery_week if actual_delivery_week >= 0 else None,
+            created_at_ns=int(self.created_at_ns[row]),
+        )
+    
+    def _grow(self) -> None:
+        """Double the capacity of every column."""
+        capacity = max(1, 2 * len(self.quantity))
+        for name in ("from_role", "to_role", "quantity", "status",
+                     "created_week", "delivery_week", "actual_delivery_week",
+                     "created_at_ns"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
@@ -1,13 +1,34 @@
 """Supply chain model for Beer Game."""
 
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Optional, Tuple
 
+import numpy as np
+import orjson
 
-@dataclass
+from ..core.constants import NODE_HISTORY_WEEKS
+from ..core.utils import get_timestamp
+
+# Role name -> SupplyChain attribute holding that role's node
+_ROLE_TO_ATTR = {
+    "Shop": "shop",
+    "Retailer": "retailer",
+    "Wholesaler": "wholesaler",
+    "Factory": "factory",
+}
+_NODE_ATTRS = frozenset(_ROLE_TO_ATTR.values())
+
+
+@dataclass(slots=True)
 class SupplyChainNode:
-    """Represents a node in the supply chain (Shop, Retailer, etc.)."""
+    """Represents a node in the supply chain (Shop, Retailer, etc.).
+    
+    The last NODE_HISTORY_WEEKS weeks of orders and inventory are kept in
+    fixed-size NumPy buffers, loaded from the engine's history matrices;
+    ``orders_history`` / ``inventory_history`` return them oldest-first as
+    arrays ready for numeric analysis.
+    """
     
     role: str  # "Shop", "Retailer", "Wholesaler", "Factory"
     player_id: str
@@ -17,8 +38,37 @@ class SupplyChainNode:
     current_order: int = 0
     incoming_order: int = 0  # Order from downstream (upstream perspective)
     total_cost: float = 0.0
-    orders_history: List[int] = field(default_factory=list)
-    inventory_history: List[int] = field(default_factory=list)
+    _orders_buf: np.ndarray = field(
+        init=False, repr=False, compare=False,
+        default_factory=lambda: np.zeros(NODE_HISTORY_WEEKS, dtype=np.int64),
+    )
+    _inventory_buf: np.ndarray = field(
+        init=False, repr=False, compare=False,
+        default_factory=lambda: np.zeros(NODE_HISTORY_WEEKS, dtype=np.int64),
+    )
+    _hist_len: int = field(init=False, repr=False, compare=False, default=0)  # weeks loaded
+    
+    def __post_init__(self) -> None:
+        """Intern the role name so equal roles share one string object."""
+        self.role = sys.intern(self.role)
+    
+    def load_history(self, orders: np.ndarray, inventory: np.ndarray) -> None:
+        """Replace the history with the given oldest-first weeks."""
+        orders = orders[-NODE_HISTORY_WEEKS:]
+        inventory = inventory[-NODE_HISTORY_WEEKS:]
+        self._orders_buf[:len(orders)] = orders
+        self._inventory_buf[:len(inventory)] = inventory
+        self._hist_len = len(orders)
+    
+    @property
+    def orders_history(self) -> np.ndarray:
+        """Orders placed over the retained weeks, oldest first."""
+        return self._orders_buf[:self._hist_len]
+    
+    @property
+    def inventory_history(self) -> np.ndarray:
+        """Inventory at the end of each retained week, oldest first."""
+        return self._inventory_buf[:self._hist_len]
     
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
@@ -31,12 +81,16 @@ class SupplyChainNode:
             "current_order": self.current_order,
             "incoming_order": self.incoming_order,
             "total_cost": self.total_cost,
-            "orders_history": self.orders_history[-52:],  # Keep last year
-            "inventory_history": self.inventory_history[-52:],
+            "orders_history": self.orders_history.tolist(),
+            "inventory_history": self.inventory_history.tolist(),
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes."""
+        return orjson.dumps(self.to_dict())
 
 
-@dataclass
+@dataclass(slots=True)
 class SupplyChain:
     """Represents a supply chain with multiple nodes."""
     
@@ -48,47 +102,69 @@ class SupplyChain:
     factory: Optional[SupplyChainNode] = None
     current_week: int = 0
     total_cost: float = 0.0
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    created_at: str = field(default_factory=get_timestamp)
+    _active_nodes: Tuple[SupplyChainNode, ...] = field(
+        init=False, repr=False, compare=False, default=()
+    )  # non-empty slots in role order, rebuilt whenever a node slot is assigned
+    
+    def __post_init__(self) -> None:
+        """Index the nodes passed to the constructor."""
+        self._refresh_active_nodes()
+    
+    def __setattr__(self, name: str, value) -> None:
+        """Set an attribute, keeping ``get_nodes`` in step with the node slots."""
+        object.__setattr__(self, name, value)
+        # _active_nodes is unset until __init__ has assigned every node slot
+        if name in _NODE_ATTRS and hasattr(self, "_active_nodes"):
+            self._refresh_active_nodes()
     
     def get_node(self, role: str) -> Optional[SupplyChainNode]:
         """Get a node by role."""
-        nodes = {
-            "Shop": self.shop,
-            "Retailer": self.retailer,
-            "Wholesaler": self.wholesaler,
-            "Factory": self.factory,
-        }
-        return nodes.get(role)
+        attr = _ROLE_TO_ATTR.get(role)
+        return getattr(self, attr) if attr is not None else None
     
     def set_node(self, role: str, node: SupplyChainNode) -> None:
         """Set a node by role."""
-        if role == "Shop":
-            self.shop = node
-        elif role == "Retailer":
-            self.retailer = node
-        elif role == "Wholesaler":
-            self.wholesaler = node
-        elif role == "Factory":
-            self.factory = node
-    
-    def get_nodes(self) -> List[SupplyChainNode]:
+        attr = _ROLE_TO_ATTR.get(role)
+        if attr is not None:
+            setattr(self, attr, node)
+    
+    def get_nodes(self) -> Tuple[SupplyChainNode, ...]:
         """Get all nodes."""
-        return [n for n in [self.shop, self.retailer, self.wholesaler, self.factory] if n]
+        return self._active_nodes
+    
+    def _refresh_active_nodes(self) -> None:
+        """Rebuild the cached tuple of non-empty node slots."""
+        self._active_nodes = tuple(
+            node for node in (self.shop, self.retailer, self.wholesaler, self.factory)
+            if node is not None
+        )
     
     def calculate_total_cost(self) -> float:
         """Calculate total supply chain cost."""
-        return sum(node.total_cost for node in self.get_nodes())
+        shop, retailer = self.shop, self.retailer
+        wholesaler, factory = self.wholesaler, self.factory
+        return ((shop.total_cost if shop is not None else 0.0)
+                + (retailer.total_cost if retailer is not None else 0.0)
+                + (wholesaler.total_cost if wholesaler is not None else 0.0)
+                + (factory.total_cost if factory is not None else 0.0))
     
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
+        shop, retailer = self.shop, self.retailer
+        wholesaler, factory = self.wholesaler, self.factory
         return {
             "chain_id": self.chain_id,
             "game_id": self.game_id,
-            "shop": self.shop.to_dict() if self.shop else None,
-            "retailer": self.retailer.to_dict() if self.retailer else None,
-            "wholesaler": self.wholesaler.to_dict() if self.wholesaler else None,
-            "factory": self.factory.to_dict() if self.factory else None,
+            "shop": shop.to_dict() if shop is not None else None,
+            "retailer": retailer.to_dict() if retailer is not None else None,
+            "wholesaler": wholesaler.to_dict() if wholesaler is not None else None,
+            "factory": factory.to_dict() if factory is not None else None,
             "current_week": self.current_week,
             "total_cost": self.calculate_total_cost(),
             "created_at": self.created_at,
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes."""
+        return orjson.dumps(self.to_dict())
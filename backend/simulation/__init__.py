@@ -0,0 +1,5 @@
+"""Compiled numeric kernels for the game simulations."""
+
+from .step import advance_week_kernel
+
+__all__ = ["advance_week_kernel"]
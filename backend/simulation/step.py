@@ -0,0 +1,40 @@
+"""Numba kernel for the weekly Beer Game node update."""
+
+from numba import njit
+
+
+@njit(cache=True)
+def advance_week_kernel(inventory, backorder, incoming_order, pipeline, costs,
+                        week, delay, hold, stock):
+    """Advance every node of every chain by one week, in place.
+    
+    Args:
+        inventory: On-hand units, ``[chain, role]``
+        backorder: Unfilled downstream demand, ``[chain, role]``
+        incoming_order: Demand received this week, ``[chain, role]``
+        pipeline: In-transit units, ``[chain, role, delivery_week % delay]``
+        costs: Accumulated cost, ``[chain, role]``
+        week: Week being advanced to
+        delay: Order delay in weeks (pipeline depth)
+        hold: Holding cost per unit per week
+        stock: Stockout cost per backordered unit per week
+    """
+    slot = week % delay
+    num_chains, num_roles = inventory.shape
+    for c in range(num_chains):
+        for r in range(num_roles):
+            # 1. Receive items from orders placed ``delay`` weeks ago
+            inventory[c, r] += pipeline[c, r, slot]
+            pipeline[c, r, slot] = 0
+            
+            # 2. Fulfill as much downstream demand as possible
+            demand = incoming_order[c, r]
+            fulfilled = min(inventory[c, r], demand)
+            inventory[c, r] -= fulfilled
+            if fulfilled < demand:
+                backorder[c, r] += demand - fulfilled
+            else:
+                backorder[c, r] = 0
+            
+            # 3. Calculate costs
+            costs[c, r] += max(inventory[c, r], 0) * hold + backorder[c, r] * stock
@@ -4,8 +4,15 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 
+
+@st.cache_resource(show_spinner=False)
+def load_environment() -> bool:
+    """Load environment variables once per server process, not per rerun."""
+    return load_dotenv()
+
+
 # Load environment variables
-load_dotenv()
+load_environment()
 
 # Configure Streamlit
 st.set_page_config(
@@ -15,7 +22,7 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Custom CSS
+# Custom CSS (re-emitted every run: Streamlit drops elements a rerun doesn't send)
 st.markdown("""
     <style>
     .main {
@@ -38,6 +45,9 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# Sidebar game modes, in display order
+_MODES = ("🏠 Home", "🍺 Beer Game", "🏭 Factory Mode", "⚔️ Campaign", "📊 Analytics")
+
 
 def main():
     """Main application entry point."""
@@ -54,21 +64,12 @@ def main():
     
     mode = st.sidebar.radio(
         "Select Game Mode",
-        options=["🏠 Home", "🍺 Beer Game", "🏭 Factory Mode", "⚔️ Campaign", "📊 Analytics"],
+        options=_MODES,
         index=0,
     )
     
     # Route to appropriate page
-    if mode == "🏠 Home":
-        show_home()
-    elif mode == "🍺 Beer Game":
-        show_beer_game()
-    elif mode == "🏭 Factory Mode":
-        show_factory_mode()
-    elif mode == "⚔️ Campaign":
-        show_campaign()
-    elif mode == "📊 Analytics":
-        show_analytics()
+    _HANDLERS[mode]()
 
 
 def show_home():
@@ -165,6 +166,7 @@ def show_beer_game():
         show_beer_game_player()
 
 
+@st.fragment
 def show_beer_game_host():
     """Display Beer Game host interface."""
     st.subheader("Host Dashboard")
@@ -200,6 +202,7 @@ def show_beer_game_host():
         st.metric("Status", "In Progress")
 
 
+@st.fragment
 def show_beer_game_player():
     """Display Beer Game player interface."""
     st.subheader("Player Dashboard")
@@ -225,6 +228,7 @@ def show_beer_game_player():
         col_c.metric("Cost", "$750", delta="-$50")
 
 
+@st.fragment
 def show_factory_mode():
     """Display Factory Mode."""
     st.title("🏭 Factory Mode")
@@ -255,6 +259,7 @@ def show_factory_mode():
         st.write("- Real-time production monitoring")
 
 
+@st.fragment
 def show_campaign():
     """Display Campaign Mode."""
     st.title("⚔️ Campaign Mode")
@@ -300,5 +305,15 @@ def show_analytics():
         st.write("Coming soon...")
 
 
+# Game mode -> page renderer
+_HANDLERS = {
+    "🏠 Home": show_home,
+    "🍺 Beer Game": show_beer_game,
+    "🏭 Factory Mode": show_factory_mode,
+    "⚔️ Campaign": show_campaign,
+    "📊 Analytics": show_analytics,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1 @@
+"""Test suite for Supply Chain Optimizer."""
@@ -0,0 +1,150 @@
+"""Tests for BeerGameEngine persistence."""
+
+import itertools
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from backend.core.game_engine import BeerGameEngine
+
+_IDS = itertools.count()
+
+
+class FakeCollection:
+    """Collection double that records writes and raises scripted errors."""
+    
+    def __init__(self):
+        self.documents = {}  # _id -> document
+        self.insert_calls = 0
+        self.update_calls = 0
+        self.insert_errors = []  # raised by upcoming insert_many calls
+        self.update_errors = []  # raised by upcoming bulk_write calls
+        self.reject = lambda document: False  # documents failing validation
+    
+    def insert_many(self, documents, ordered=True):
+        self.insert_calls += 1
+        for document in documents:
+            document.setdefault("_id", next(_IDS))
+        if self.insert_errors:
+            raise self.insert_errors.pop(0)
+        write_errors = []
+        for index, document in enumerate(documents):
+            if document["_id"] in self.documents:
+                write_errors.append({"index": index, "code": 11000, "errmsg": "duplicate"})
+            elif self.reject(document):
+                write_errors.append({"index": index, "code": 121, "errmsg": "invalid"})
+            else:
+                self.documents[document["_id"]] = document
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors})
+    
+    def bulk_write(self, operations, ordered=True):
+        self.update_calls += 1
+        if self.update_errors:
+            raise self.update_errors.pop(0)
+
+
+class FakeDatabase(dict):
+    """Database double creating collections on first access."""
+    
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def engine(db):
+    engine = BeerGameEngine(db)
+    game_id = engine.create_game(num_chains=1, weeks=10)
+    engine.join_game(game_id, "chain_0", "Shop", "Alice")
+    engine.join_game(game_id, "chain_0", "Retailer", "Bob")
+    engine.game_id = game_id
+    return engine
+
+
+def _place_order(engine):
+    return engine.process_order(engine.game_id, "chain_0", "Shop", "Retailer", 5)
+
+
+def test_create_and_join_are_persisted(db, engine):
+    assert len(db["games"].documents) == 1
+    assert len(db["supply_chains"].documents) == 1
+    assert len(db["players"].documents) == 2
+
+
+def test_connection_failure_is_retried(db, engine):
+    db["orders"].insert_errors.append(AutoReconnect("down"))
+    _place_order(engine)
+    
+    assert engine.advance_week(engine.game_id)
+    assert not db["orders"].documents
+    assert engine._pending_writes["orders"]
+    
+    assert engine.flush_pending()
+    assert len(db["orders"].documents) == 1
+    assert not engine._pending_writes and not engine._pending_updates
+
+
+def test_updates_wait_for_their_collection_inserts(db, engine):
+    db["orders"].insert_errors.append(AutoReconnect("down"))
+    order_id = _place_order(engine)
+    engine._queue_update("orders", {"order_id": order_id}, {"status": "shipped"})
+    engine._queue_update("games", {"game_id": engine.game_id}, {"status": "playing"})
+    
+    assert not engine.flush_pending()
+    # Games updates do not depend on the failed orders insert
+    assert db["games"].update_calls == 1
+    assert db["orders"].update_calls == 0
+    assert len(engine._pending_updates["orders"]) == 1
+    
+    assert engine.flush_pending()
+    assert len(db["orders"].documents) == 1
+    assert db["orders"].update_calls == 1
+
+
+def test_rejected_document_is_dropped(db, engine):
+    db["orders"].reject = lambda document: document["quantity"] == 13
+    engine.process_order(engine.game_id, "chain_0", "Shop", "Retailer", 13)
+    _place_order(engine)
+    
+    for _ in range(30):
+        engine.advance_week(engine.game_id)
+    
+    assert db["orders"].insert_calls == 1
+    assert len(db["orders"].documents) == 1
+    assert db["games"].update_calls == 30
+    assert not engine._pending_writes and not engine._pending_updates
+
+
+def test_update_connection_failure_is_retried(db, engine):
+    db["games"].update_errors.append(AutoReconnect("down"))
+    
+    engine.advance_week(engine.game_id)
+    assert len(engine._pending_updates["games"]) == 1
+    
+    assert engine.flush_pending()
+    assert db["games"].update_calls == 2
+    assert not engine._pending_updates
+
+
+def test_duplicate_on_retry_counts_as_stored(db, engine):
+    document = next(iter(db["players"].documents.values()))
+    engine._pending_writes["players"].append(document)
+    
+    assert engine.flush_pending()
+    assert len(db["players"].documents) == 2
+
+
+def test_customer_demand_is_never_negative():
+    engine = BeerGameEngine()
+    game_id = engine.create_game(num_chains=1, weeks=52, demand_pattern="sine_wave")
+    engine.join_game(game_id, "chain_0", "Shop", "Alice")
+    
+    assert engine.games[game_id]["demand_trace"].min() >= 0
+    assert engine.place_customer_order(game_id, "chain_0", 45)
+    assert not engine.place_customer_order(game_id, "chain_0", 45, quantity=-4)